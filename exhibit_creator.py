@@ -4,9 +4,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import re
+import os
+import argparse
 from sys import platform as _platform
 import math
-from PIL import Image, ImageDraw, ImageFont
+from xml.sax.saxutils import escape
+from PIL import Image, ImageDraw, ImageFont, ImageTk
 
 """
 //////////////////////////////////////////////////////
@@ -30,21 +33,40 @@ LIMIT_EXHIBIT_MAX_CHAR = 104
 LIMIT_EXHIBIT_MAX_LINES = 34
 LIMIT_DND_HEIGHT_PX = 764
 LIMIT_DND_WIDTH_PX = 950
-
-# ImageFont needs path to the font file
-if _platform == "darwin":
+LIMIT_DND_MAX_OPTIONS = 10
+LIMIT_DND_OPTION_MAX_LINES = 3
+LIMIT_DND_OPTION_MAX_CHAR = int(LIMIT_EXHIBIT_MAX_CHAR/2)-1
+
+# Selected option text is replaced by a target in the main DnD exhibit
+TARGET_REPLACEMENT = ' _____ '
+# Batch DnD items mark option text inline as [[option text]]
+OPTION_MARKUP_PATTERN = re.compile(r'\[\[(.+?)\]\]', re.DOTALL)
+
+# ImageFont needs path to the font file. Set EXHIBIT_CREATOR_FONT to use a different file
+if 'EXHIBIT_CREATOR_FONT' in os.environ:
+    FONT_FILE_PATH = os.environ['EXHIBIT_CREATOR_FONT']
+elif _platform == "darwin":
     # MAC OS X
     FONT_FILE_PATH = "/System/Library/Fonts/Supplemental/Courier New.ttf"
 elif _platform == "win32":
     # Windows
     FONT_FILE_PATH = "C:\Windows\Fonts\cour.ttf"
 else:
-   exit("OS platform not defined. This was written with Windows or MAC OSX in mind.")
+    # Linux, with the Microsoft core fonts (ttf-mscorefonts-installer) installed
+    FONT_FILE_PATH = "/usr/share/fonts/truetype/msttcorefonts/cour.ttf"
 
-IMAGE_FONT = ImageFont.truetype(FONT_FILE_PATH, FONT_SIZE_PX)
+if os.path.exists(FONT_FILE_PATH):
+    IMAGE_FONT = ImageFont.truetype(FONT_FILE_PATH, FONT_SIZE_PX)
+else:
+    print("Font file not found: " + FONT_FILE_PATH + ". Set EXHIBIT_CREATOR_FONT to the path " \
+        "of Courier New. Using the default font, so text will not match the character widths.")
+    IMAGE_FONT = ImageFont.load_default(FONT_SIZE_PX)
 
 LARGE_FONT = ("Verdana", 16)
 
+# Preview is refreshed on the first edit, then at most once per delay while typing continues
+PREVIEW_REFRESH_DELAY_MS = 25
+
 class ExhibitCreatorapp(tk.Tk):
 
     def __init__(self, *args, **kwargs):
@@ -123,7 +145,13 @@ class BasicExhibitPage(tk.Frame):
             command=self.show_file_dialog)
         selectFileLocationButton.grid(row=2, column=1, sticky='W')
 
-        filenameLabel = ttk.Label(self, text="Filename (path .png):")
+        self.preview = None
+        self.exhibitTextEntry.bind('<<Modified>>', self.exhibit_text_modified)
+
+        showPreviewButton = ttk.Button(self, text="Show Preview", command=self.show_preview)
+        showPreviewButton.grid(row=2, column=1, sticky='E')
+
+        filenameLabel = ttk.Label(self, text="Filename (path .png/.svg/.pdf):")
         filenameLabel.grid(row=3, column=0, sticky='E')
 
         self.filename = tk.Entry(self, textvariable=self.FilenameVar, width=50)
@@ -135,9 +163,36 @@ class BasicExhibitPage(tk.Frame):
 
     def show_file_dialog(self):
         filename_and_path = filedialog.asksaveasfilename(initialdir = ".",
-            title = "Select file", filetypes = (("png files","*.png"), ("all files","*.*")))
+            title = "Select file", filetypes = (("png files","*.png"), ("svg files","*.svg"),
+            ("pdf files","*.pdf"), ("all files","*.*")))
         self.FilenameVar.set(filename_and_path)
 
+    def show_preview(self):
+        if self.preview is None or not self.preview.winfo_exists():
+            self.preview = PreviewWindow(self, "Exhibit Preview",
+                (LIMIT_EXHIBIT_MAX_CHAR * CHARACTER_WIDTH_PX) + (2*BORDER_PADDING_PX),
+                (LIMIT_EXHIBIT_MAX_LINES * LINE_HEIGHT_PX) + (2*BORDER_PADDING_PX),
+                self.refresh_preview)
+        self.refresh_preview()
+
+    def exhibit_text_modified(self, event):
+        # resetting the modified flag fires <<Modified>> again, so ignore that event
+        if self.exhibitTextEntry.edit_modified():
+            self.exhibitTextEntry.edit_modified(False)
+            if self.preview is not None and self.preview.winfo_exists():
+                self.preview.schedule_refresh()
+
+    def refresh_preview(self):
+        exhibit_text = self.exhibitTextEntry.get("1.0",'end-1c')
+        image_width_in_pixels = (find_len_longest_line(exhibit_text) * CHARACTER_WIDTH_PX) + \
+            (2*BORDER_PADDING_PX)
+        image_height_in_pixels = (find_number_of_lines_in_text(exhibit_text) * LINE_HEIGHT_PX) + \
+            (2*BORDER_PADDING_PX)
+        line_placements = [(BORDER_PADDING_PX, text_start_height, line)
+            for text_start_height, line in calc_line_positions(exhibit_text)]
+        self.preview.show_image(image_width_in_pixels, image_height_in_pixels, line_placements,
+            [(0, 0, image_width_in_pixels, image_height_in_pixels)])
+
     def process_exhibit_text(self):
         self.exhibit_text=self.exhibitTextEntry.get("1.0",'end-1c')
         self.image_file_name=self.filename.get()
@@ -204,6 +259,13 @@ class DnDImagesPage(tk.Frame):
         self.Option8TextVar = tk.StringVar()
         self.Option9TextVar = tk.StringVar()
         self.Option10TextVar = tk.StringVar()
+        self.option_text_vars = (self.Option1TextVar, self.Option2TextVar, self.Option3TextVar,
+            self.Option4TextVar, self.Option5TextVar, self.Option6TextVar, self.Option7TextVar,
+            self.Option8TextVar, self.Option9TextVar, self.Option10TextVar)
+
+        self.preview = None
+        for option_text_var in self.option_text_vars:
+            option_text_var.trace_add('write', self.schedule_preview_refresh)
 
         self.grid_rowconfigure((1,2,3,4,5,6,7,8,9,10), minsize=65, uniform=65)
 
@@ -243,6 +305,7 @@ class DnDImagesPage(tk.Frame):
         self.dnd_main_text_entry = tk.Text(self, bg='white', borderwidth=2,
             relief=tk.SUNKEN, height=LIMIT_EXHIBIT_MAX_LINES, width=LIMIT_EXHIBIT_MAX_CHAR)
         self.dnd_main_text_entry.grid(row=1, column=1, rowspan=7)
+        self.dnd_main_text_entry.bind('<<Modified>>', self.exhibit_text_modified)
 
         # Cannot find a way to change text content without using StringVar
         # StringVar does not seem to work with lists or loops, so need to
@@ -295,11 +358,16 @@ class DnDImagesPage(tk.Frame):
             height=1, borderwidth=2, relief="sunken", justify='left', anchor='w')
         self.exhibitSizeLabel.grid(row=7, column=0)
 
+        self.show_preview_button = ttk.Button(self, text="Show Preview",
+            command=self.show_preview)
+        self.show_preview_button.grid(row=8, column=0)
+
         self.select_file_location_button = ttk.Button(self, text="Select save file location",
             command=self.show_file_dialog)
         self.select_file_location_button.grid(row=8, column=1, sticky='WS')
 
-        self.filename_label = ttk.Label(self, text="Filename (path .png):", background='white')
+        self.filename_label = ttk.Label(self, text="Filename (path .png/.svg/.pdf):",
+            background='white')
         self.filename_label.grid(row=9, column=0, sticky='NE')
 
         self.filename = tk.Entry(self, textvariable=self.FilenameVar, width=50)
@@ -440,9 +508,8 @@ class DnDImagesPage(tk.Frame):
                 self.options_height_pixels = self.proposed_total_height_pixels
                 self.options_width_pixels = self.proposed_total_options_width_pixels
 
-                text_replacement = ' _____ '
                 self.dnd_main_text_entry.delete(tk.SEL_FIRST, tk.SEL_LAST)
-                self.dnd_main_text_entry.insert(selected_text_start, text_replacement)
+                self.dnd_main_text_entry.insert(selected_text_start, TARGET_REPLACEMENT)
 
                 self.option_text = self.selected_text
                 self.update_option()
@@ -452,90 +519,26 @@ class DnDImagesPage(tk.Frame):
 
 
     def calc_proposed_area_required(self):
-        # calculate main exhibit size in pixels
+        # calculate main exhibit, option and total DnD size in pixels
         self.exhibit_text=self.dnd_main_text_entry.get("1.0",'end-1c')
-        target_pattern = re.compile(r'_____')
-        max_length = 0
-        number_of_lines_with_options = 0
-        text_by_lines = self.exhibit_text.split('\n')
-        number_of_lines = len(text_by_lines)
-        for index, line in enumerate(text_by_lines):
-            number_of_targets = 0
-            targets = target_pattern.findall(line)
-            if len(targets) > 0:
-                number_of_lines_with_options = number_of_lines_with_options + 1
-                number_of_targets = len(targets)
-
-                non_target_text_length = len(line) - (number_of_targets * 5)
-                if index == (self.proposed_text_start_line - 1):
-                    # new target is to be added to this line
-                    number_of_targets = number_of_targets + 1
-                line_length = non_target_text_length + \
-                    (number_of_targets * self.proposed_target_text_length)
-            else:
-                line_length = len(line)
-
-            if line_length > max_length:
-                max_length = line_length
-        if self.proposed_text_start_line > 0:
-            # this is a new target in exhibit: add one to the number of height_no_targets
-            number_of_lines_with_options = number_of_lines_with_options + 1
+        area = calc_dnd_area_required(self.exhibit_text, self.proposed_text_start_line,
+            self.proposed_target_text_length, self.proposed_option_lines,
+            self.options_max_line_width, self.options_max_lines, self.number_of_options + 1)
 
-        self.proposed_exhibit_height_pixels = ((number_of_lines - number_of_lines_with_options)*
-            LINE_HEIGHT_PX)   + (number_of_lines_with_options * ((self.proposed_option_lines *
-            LINE_HEIGHT_PX) + (2 * (BORDER_PADDING_PX + 3)))) + (2 * (BORDER_PADDING_PX))
-        self.proposed_exhibit_width_pixels = (max_length * CHARACTER_WIDTH_PX) + \
-            (2 * BORDER_PADDING_PX)
+        self.proposed_exhibit_height_pixels = area['exhibit_height_pixels']
+        self.proposed_exhibit_width_pixels = area['exhibit_width_pixels']
         print("proposed exhibit height (pixels): " + str(self.proposed_exhibit_height_pixels))
         print("proposed exhibit width (pixels): " + str(self.proposed_exhibit_width_pixels))
 
-        # calculate size in pixels needed for an option
-        if self.proposed_target_text_length > self.options_max_line_width:
-            proposed_option_max_text_length = self.proposed_target_text_length
-        else:
-            proposed_option_max_text_length = self.options_max_line_width
-
-        if self.proposed_option_lines > self.options_max_lines:
-            proposed_option_max_lines = self.proposed_option_lines
-        else:
-            proposed_option_max_lines = self.options_max_lines
-
-        self.proposed_options_height_pixels = (proposed_option_max_lines * LINE_HEIGHT_PX) + \
-            (2* (BORDER_PADDING_PX))
-        self.proposed_options_width_pixels = (max_length * CHARACTER_WIDTH_PX) + \
-            (2* (BORDER_PADDING_PX))
-
+        self.proposed_options_height_pixels = area['options_height_pixels']
+        self.proposed_options_width_pixels = area['options_width_pixels']
         print("proposed option height (pixels): " + str(self.proposed_options_height_pixels))
         print("proposed option width (pixels): " + str(self.proposed_options_width_pixels))
 
-        proposed_number_of_options = self.number_of_options + 1
-
-        # allow 5 pixels spacing between sides and options, and between columns
-        if self.proposed_options_width_pixels < ((LIMIT_DND_WIDTH_PX - 20) / 3):
-            # can arrange options side by side in 3 columns
-            options_in_a_row = 3
-            options_in_a_column = math.ceil(proposed_number_of_options /options_in_a_row)
-        elif self.proposed_options_width_pixels < ((LIMIT_DND_WIDTH_PX - 15) / 2):
-            # can arrange options side by side in 2 columns
-            options_in_a_row = 2
-            options_in_a_column = math.ceil(proposed_number_of_options /options_in_a_column)
-        else:
-            # need to arrange options in a single column
-            options_in_a_row = 1
-            options_in_a_column = proposed_number_of_options
-
-        # allow 5 pixels spacing between rows, and at top and bottom of option area
-        self.proposed_total_options_height_pixels = (options_in_a_column * \
-            (self.proposed_options_height_pixels + 5)) + 5
-        self.proposed_total_options_width_pixels = (options_in_a_row * \
-            (self.proposed_options_width_pixels + 5)) + 5
-
-        self.proposed_total_height_pixels = self.proposed_total_options_height_pixels + \
-            self.proposed_exhibit_height_pixels
-        if self.proposed_total_options_width_pixels > self.proposed_exhibit_width_pixels:
-            self.proposed_total_width_pixels = self.proposed_total_options_width_pixels
-        else:
-            self.proposed_total_width_pixels =  self.proposed_exhibit_width_pixels
+        self.proposed_total_options_height_pixels = area['total_options_height_pixels']
+        self.proposed_total_options_width_pixels = area['total_options_width_pixels']
+        self.proposed_total_height_pixels = area['total_height_pixels']
+        self.proposed_total_width_pixels = area['total_width_pixels']
 
 
     def update_option(self):
@@ -582,76 +585,172 @@ class DnDImagesPage(tk.Frame):
 
     def show_file_dialog(self):
         filename_and_path = filedialog.asksaveasfilename(initialdir = ".",
-            title = "Select file",filetypes = (("png files","*.png"),("all files","*.*")))
+            title = "Select file",filetypes = (("png files","*.png"),("svg files","*.svg"),
+            ("pdf files","*.pdf"),("all files","*.*")))
         self.FilenameVar.set(filename_and_path)
 
 
+    def option_texts(self):
+        options = []
+        for option_text_var in self.option_text_vars:
+            if len(option_text_var.get()) > 1:
+                options.append(option_text_var.get())
+        return options
+
+
+    def show_preview(self):
+        if self.preview is None or not self.preview.winfo_exists():
+            self.preview = PreviewWindow(self, "DnD Preview", LIMIT_DND_WIDTH_PX,
+                LIMIT_DND_HEIGHT_PX, self.refresh_preview)
+        self.refresh_preview()
+
+
+    def exhibit_text_modified(self, event):
+        # resetting the modified flag fires <<Modified>> again, so ignore that event
+        if self.dnd_main_text_entry.edit_modified():
+            self.dnd_main_text_entry.edit_modified(False)
+            self.schedule_preview_refresh()
+
+
+    def schedule_preview_refresh(self, *args):
+        if self.preview is not None and self.preview.winfo_exists():
+            self.preview.schedule_refresh()
+
+
+    def refresh_preview(self):
+        exhibit_text = self.dnd_main_text_entry.get("1.0",'end-1c')
+        options = self.option_texts()
+        area = calc_dnd_area_required(exhibit_text, 0, self.options_max_line_width,
+            self.options_max_lines, self.options_max_line_width, self.options_max_lines,
+            len(options))
+
+        image_text = re.sub('_____', ('_'*self.options_max_line_width), exhibit_text)
+        line_placements = [(BORDER_PADDING_PX, text_start_height, line) for text_start_height, line
+            in calc_variable_spacing_line_positions(image_text, self.options_max_lines)]
+        boxes = [(0, 0, area['exhibit_width_pixels'], area['exhibit_height_pixels'])]
+
+        # option images in the grid, with 5 pixels spacing between options and around the grid
+        option_width_in_pixels = area['options_width_pixels']
+        option_height_in_pixels = area['options_height_pixels']
+        for option_index, option_text in enumerate(options):
+            option_x = 5 + ((option_index % area['options_in_a_row']) * \
+                (option_width_in_pixels + 5))
+            option_y = area['exhibit_height_pixels'] + 5 + \
+                ((option_index // area['options_in_a_row']) * (option_height_in_pixels + 5))
+            boxes.append((option_x, option_y, option_x + option_width_in_pixels,
+                option_y + option_height_in_pixels))
+            for text_start_height, line in calc_line_positions(option_text):
+                line_placements.append((option_x + BORDER_PADDING_PX,
+                    option_y + text_start_height, line))
+
+        self.preview.show_image(area['total_width_pixels'], area['total_height_pixels'],
+            line_placements, boxes)
+
+
     def process_text_to_images(self):
         self.exhibit_text=self.dnd_main_text_entry.get("1.0",'end-1c')
-        self.proposed_text_start_line = 0
-        self.calc_proposed_area_required()
-        self.exhibit_height_pixels = self.proposed_exhibit_height_pixels
-        self.exhibit_width_pixels = self.proposed_exhibit_width_pixels
-
-        image_text = re.sub('_____', ('_'*self.options_max_line_width), self.exhibit_text)
         self.image_file_name=self.filename.get()
-        create_variable_spacing_image(image_text, self.image_file_name,
-            self.exhibit_width_pixels, self.exhibit_height_pixels, self.options_max_lines)
-        if len(self.Option1TextVar.get()) > 1:
-            this_option_text = self.Option1TextVar.get()
-            this_option_filename = re.sub('.png', '_option1.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
-        if len(self.Option2TextVar.get()) > 1:
-            this_option_text = self.Option2TextVar.get()
-            this_option_filename = re.sub('.png', '_option2.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
-        if len(self.Option3TextVar.get()) > 1:
-            this_option_text = self.Option3TextVar.get()
-            this_option_filename = re.sub('.png', '_option3.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
-        if len(self.Option4TextVar.get()) > 1:
-            this_option_text = self.Option4TextVar.get()
-            this_option_filename = re.sub('.png', '_option4.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
-        if len(self.Option5TextVar.get()) > 1:
-            this_option_text = self.Option5TextVar.get()
-            this_option_filename = re.sub('.png', '_option5.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
-        if len(self.Option6TextVar.get()) > 1:
-            this_option_text = self.Option6TextVar.get()
-            this_option_filename = re.sub('.png', '_option6.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
-        if len(self.Option7TextVar.get()) > 1:
-            this_option_text = self.Option7TextVar.get()
-            this_option_filename = re.sub('.png', '_option7.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
-        if len(self.Option8TextVar.get()) > 1:
-            this_option_text = self.Option8TextVar.get()
-            this_option_filename = re.sub('.png', '_option8.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
-        if len(self.Option9TextVar.get()) > 1:
-            this_option_text = self.Option9TextVar.get()
-            this_option_filename = re.sub('.png', '_option9.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
-        if len(self.Option10TextVar.get()) > 1:
-            this_option_text = self.Option10TextVar.get()
-            this_option_filename = re.sub('.png', '_option10.png', self.image_file_name)
-            create_image_from_text(this_option_text, this_option_filename,
-                self.options_max_line_width, self.options_max_lines)
+        create_dnd_images(self.exhibit_text, self.option_texts(), self.image_file_name,
+            self.options_max_line_width, self.options_max_lines)
 
         messagebox.showinfo(title="Completed", message=("Image files created: " + \
             self.image_file_name))
 
 
+class PreviewWindow(tk.Toplevel):
+    # each line is rasterized into its own strip, cached by line text, so an edit only
+    # rasterizes the lines which changed; edits within PREVIEW_REFRESH_DELAY_MS share one redraw
+
+    def __init__(self, parent, title, width_in_pixels, height_in_pixels, refresh_callback):
+        tk.Toplevel.__init__(self, parent)
+        tk.Toplevel.wm_title(self, title)
+
+        self.width_limit_in_pixels = width_in_pixels
+        self.height_limit_in_pixels = height_in_pixels
+        self.refresh_callback = refresh_callback
+        self.refresh_after_id = None
+        self.edited_during_delay = False
+        self.line_strips = {}
+        self.line_items = []
+
+        self.canvas = tk.Canvas(self, width=width_in_pixels, height=height_in_pixels,
+            bg='grey', highlightthickness=0)
+        self.canvas.grid(row=0, column=0)
+
+        self.SizeVar = tk.StringVar()
+        self.size_label = tk.Label(self, textvariable=self.SizeVar, borderwidth=2,
+            relief="sunken", justify='left', anchor='w')
+        self.size_label.grid(row=1, column=0, sticky='EW')
+
+        self.bind('<Destroy>', self.cancel_refresh)
+
+    def cancel_refresh(self, event):
+        # <Destroy> is also delivered for each child widget, so only act on the window itself
+        if event.widget is self and self.refresh_after_id is not None:
+            self.after_cancel(self.refresh_after_id)
+            self.refresh_after_id = None
+
+    def schedule_refresh(self):
+        if self.refresh_after_id is None:
+            self.refresh_callback()
+            self.refresh_after_id = self.after(PREVIEW_REFRESH_DELAY_MS, self.end_refresh_delay)
+        else:
+            self.edited_during_delay = True
+
+    def end_refresh_delay(self):
+        self.refresh_after_id = None
+        if self.edited_during_delay and self.winfo_exists():
+            self.edited_during_delay = False
+            self.schedule_refresh()
+
+    def line_strip(self, line):
+        line_strip = self.line_strips.get(line)
+        if line_strip is None:
+            strip_img = Image.new('RGB', (len(line) * CHARACTER_WIDTH_PX, LINE_HEIGHT_PX),
+                color=('white'))
+            ImageDraw.Draw(strip_img).text((0, 0), line, font=IMAGE_FONT, fill=('black'))
+            line_strip = ImageTk.PhotoImage(strip_img)
+        return line_strip
+
+    def show_image(self, image_width_in_pixels, image_height_in_pixels, line_placements, boxes):
+        # line_placements are (x, y, line text), boxes are (x0, y0, x1, y1) with a 2 pixel border
+        self.canvas.delete('box')
+        self.canvas.create_rectangle(0, 0, image_width_in_pixels, image_height_in_pixels,
+            fill='white', width=0, tags='box')
+        for x0, y0, x1, y1 in boxes:
+            # canvas outline is centred on the rectangle edge, so inset by 1 pixel
+            self.canvas.create_rectangle(x0 + 1, y0 + 1, x1 - 1, y1 - 1, outline='black',
+                width=2, tags='box')
+        self.canvas.tag_lower('box')
+
+        # strips no longer shown are dropped from the cache
+        line_strips = {}
+        line_placements = [placement for placement in line_placements if len(placement[2]) > 0]
+        for index, (x, y, line) in enumerate(line_placements):
+            line_strips[line] = self.line_strip(line)
+            if index < len(self.line_items):
+                line_item, shown_placement = self.line_items[index]
+                if shown_placement != (x, y, line):
+                    self.canvas.coords(line_item, x, y)
+                    self.canvas.itemconfigure(line_item, image=line_strips[line])
+                    self.line_items[index] = (line_item, (x, y, line))
+            else:
+                line_item = self.canvas.create_image(x, y, image=line_strips[line], anchor='nw')
+                self.line_items.append((line_item, (x, y, line)))
+        for line_item, shown_placement in self.line_items[len(line_placements):]:
+            self.canvas.delete(line_item)
+        del self.line_items[len(line_placements):]
+        self.line_strips = line_strips
+
+        self.SizeVar.set("Image size pixels=" + str(image_width_in_pixels) + "*" + \
+            str(image_height_in_pixels))
+        if image_width_in_pixels > self.width_limit_in_pixels or \
+            image_height_in_pixels > self.height_limit_in_pixels:
+            self.size_label.configure(fg='red')
+        else:
+            self.size_label.configure(fg='black')
+
+
 def find_number_of_lines_in_text(text):
     number_of_lines = 0
 
@@ -678,10 +777,16 @@ def create_image_from_text(text, image_filename, max_len_of_text, max_lines):
     text_pixel_width = (max_len_of_text * CHARACTER_WIDTH_PX) + (2*BORDER_PADDING_PX)
     text_pixel_height = (max_lines * LINE_HEIGHT_PX) + (2*BORDER_PADDING_PX)
 
+    if is_vector_filename(image_filename):
+        create_vector_image(calc_line_positions(text), image_filename, text_pixel_width,
+            text_pixel_height)
+        return
+
     img = Image.new('RGB', (text_pixel_width, text_pixel_height), color = ('white'))
 
     drawing = ImageDraw.Draw(img)
-    drawing.text((BORDER_PADDING_PX, BORDER_PADDING_PX), text, font=IMAGE_FONT, fill=('black'))
+    for text_start_height, line in calc_line_positions(text):
+        drawing.text((BORDER_PADDING_PX, text_start_height), line, font=IMAGE_FONT, fill=('black'))
     drawing.rectangle([(0,0), (text_pixel_width, text_pixel_height)], fill=None, outline='black',
         width=2)
     # border appears as only 1 pixel width along right and bottom sides, so draw an extra line
@@ -692,26 +797,46 @@ def create_image_from_text(text, image_filename, max_len_of_text, max_lines):
     img.save(image_filename)
 
 
-def create_variable_spacing_image(text, image_filename, image_width_in_pixels,
-    image_height_in_pixels, lines_per_option):
+def calc_line_positions(text):
+    return [(BORDER_PADDING_PX + (index * LINE_HEIGHT_PX), line)
+        for index, line in enumerate(text.split('\n'))]
 
+
+def calc_variable_spacing_line_positions(text, lines_per_option):
+    # lines with targets have extra space above and below to fit an option image
     text_start_height = BORDER_PADDING_PX
-    img = Image.new('RGB', (image_width_in_pixels, image_height_in_pixels), color=('white'))
     target_pattern = re.compile(r'_____')
-    drawing = ImageDraw.Draw(img)
+    line_positions = []
     text_by_lines = text.split('\n')
     for line in text_by_lines:
 
         targets = target_pattern.findall(line)
         if len(targets) > 0:
             text_start_height = text_start_height + BORDER_PADDING_PX + 3
-            drawing.text((BORDER_PADDING_PX, text_start_height), line, font=IMAGE_FONT, fill=('black'))
+            line_positions.append((text_start_height, line))
             text_start_height = text_start_height + (lines_per_option * LINE_HEIGHT_PX) + \
                 BORDER_PADDING_PX + 3
         else:
-            drawing.text((BORDER_PADDING_PX, text_start_height), line, font=IMAGE_FONT, fill=('black'))
+            line_positions.append((text_start_height, line))
             text_start_height = text_start_height + LINE_HEIGHT_PX
 
+    return line_positions
+
+
+def create_variable_spacing_image(text, image_filename, image_width_in_pixels,
+    image_height_in_pixels, lines_per_option):
+
+    line_positions = calc_variable_spacing_line_positions(text, lines_per_option)
+    if is_vector_filename(image_filename):
+        create_vector_image(line_positions, image_filename, image_width_in_pixels,
+            image_height_in_pixels)
+        return
+
+    img = Image.new('RGB', (image_width_in_pixels, image_height_in_pixels), color=('white'))
+    drawing = ImageDraw.Draw(img)
+    for text_start_height, line in line_positions:
+        drawing.text((BORDER_PADDING_PX, text_start_height), line, font=IMAGE_FONT, fill=('black'))
+
     drawing.rectangle([(0, 0), (image_width_in_pixels, image_height_in_pixels)], fill=None,
         outline='black', width=2)
     # border appears as only 1 pixel width along right and bottom sides,
@@ -723,5 +848,340 @@ def create_variable_spacing_image(text, image_filename, image_width_in_pixels,
     img.save(image_filename)
 
 
-APP = ExhibitCreatorapp()
-APP.mainloop()
+def is_vector_filename(image_filename):
+    return os.path.splitext(image_filename)[1].lower() in ('.svg', '.pdf')
+
+
+def create_vector_image(line_positions, image_filename, image_width_in_pixels,
+    image_height_in_pixels):
+    # SVG or PDF text (chosen by file extension) with the same 2 pixel border as the PNG images;
+    # line_positions give the top of each line, so baselines are offset by the font ascent
+    font_ascent_px = IMAGE_FONT.getmetrics()[0]
+    if os.path.splitext(image_filename)[1].lower() == '.pdf':
+        vector_image = vector_pdf_from_lines(line_positions, image_width_in_pixels,
+            image_height_in_pixels, font_ascent_px)
+    else:
+        vector_image = vector_svg_from_lines(line_positions, image_width_in_pixels,
+            image_height_in_pixels, font_ascent_px).encode('utf-8')
+    with open(image_filename, 'wb') as vector_file:
+        vector_file.write(vector_image)
+
+
+def vector_svg_from_lines(line_positions, image_width_in_pixels, image_height_in_pixels,
+    font_ascent_px):
+    svg_lines = [
+        '<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">' % (
+            image_width_in_pixels, image_height_in_pixels, image_width_in_pixels,
+            image_height_in_pixels),
+        '<rect width="100%" height="100%" fill="white"/>',
+        '<g font-family="\'Courier New\', Courier, monospace" font-size="%d" fill="black" '
+            'xml:space="preserve">' % FONT_SIZE_PX,
+    ]
+    for text_start_height, line in line_positions:
+        if len(line) > 0:
+            svg_lines.append('<text x="%d" y="%d">%s</text>' % (BORDER_PADDING_PX,
+                text_start_height + font_ascent_px, escape(line)))
+    svg_lines.append('</g>')
+    # stroke is centred on the rectangle edge, so inset by 1 pixel for a 2 pixel border
+    svg_lines.append('<rect x="1" y="1" width="%d" height="%d" fill="none" stroke="black" '
+        'stroke-width="2"/>' % (image_width_in_pixels - 2, image_height_in_pixels - 2))
+    svg_lines.append('</svg>')
+    return '\n'.join(svg_lines) + '\n'
+
+
+def vector_pdf_from_lines(line_positions, image_width_in_pixels, image_height_in_pixels,
+    font_ascent_px):
+    # 1 pixel = 1 point. The built-in Courier font is 600/1000 em wide, so 15pt text is
+    # 9 points per character, matching CHARACTER_WIDTH_PX. PDF y axis runs bottom to top.
+    content_lines = ['0 g', 'BT', '/F1 %d Tf' % FONT_SIZE_PX]
+    for text_start_height, line in line_positions:
+        if len(line) > 0:
+            pdf_text = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            content_lines.append('1 0 0 1 %d %d Tm (%s) Tj' % (BORDER_PADDING_PX,
+                image_height_in_pixels - (text_start_height + font_ascent_px), pdf_text))
+    content_lines.append('ET')
+    content_lines.append('2 w 1 1 %d %d re S' % (image_width_in_pixels - 2,
+        image_height_in_pixels - 2))
+    content = '\n'.join(content_lines)
+    # the Courier font is declared with WinAnsiEncoding, which is cp1252
+    unencodable_characters = set()
+    for character in content:
+        try:
+            character.encode('cp1252')
+        except UnicodeEncodeError:
+            unencodable_characters.add(character)
+    if len(unencodable_characters) > 0:
+        print("Characters which cannot be shown in the PDF font were replaced with '?': " + \
+            ' '.join(sorted(unencodable_characters)))
+    content = content.encode('cp1252', errors='replace')
+
+    pdf_objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        ('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            '/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>'
+            % (image_width_in_pixels, image_height_in_pixels)).encode('ascii'),
+        b'<< /Length ' + str(len(content)).encode('ascii') + b' >>\nstream\n' + content + \
+            b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>',
+    ]
+    pdf = b'%PDF-1.4\n'
+    object_offsets = []
+    for object_number, pdf_object in enumerate(pdf_objects, start=1):
+        object_offsets.append(len(pdf))
+        pdf = pdf + str(object_number).encode('ascii') + b' 0 obj\n' + pdf_object + b'\nendobj\n'
+    xref_offset = len(pdf)
+    pdf = pdf + ('xref\n0 %d\n0000000000 65535 f \n' % (len(pdf_objects) + 1)).encode('ascii')
+    for object_offset in object_offsets:
+        pdf = pdf + ('%010d 00000 n \n' % object_offset).encode('ascii')
+    pdf = pdf + ('trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(pdf_objects) + 1, xref_offset)).encode('ascii')
+    return pdf
+
+
+def calc_dnd_area_required(exhibit_text, proposed_text_start_line, proposed_target_text_length,
+    proposed_option_lines, options_max_line_width, options_max_lines, number_of_options):
+    # number_of_options is the number of options to lay out, including any proposed option
+    # calculate main exhibit size in pixels
+    target_pattern = re.compile(r'_____')
+    max_length = 0
+    number_of_lines_with_options = 0
+    text_by_lines = exhibit_text.split('\n')
+    number_of_lines = len(text_by_lines)
+    for index, line in enumerate(text_by_lines):
+        number_of_targets = 0
+        targets = target_pattern.findall(line)
+        if len(targets) > 0:
+            number_of_lines_with_options = number_of_lines_with_options + 1
+            number_of_targets = len(targets)
+
+            non_target_text_length = len(line) - (number_of_targets * 5)
+            if index == (proposed_text_start_line - 1):
+                # new target is to be added to this line
+                number_of_targets = number_of_targets + 1
+            line_length = non_target_text_length + \
+                (number_of_targets * proposed_target_text_length)
+        else:
+            line_length = len(line)
+
+        if line_length > max_length:
+            max_length = line_length
+    if proposed_text_start_line > 0:
+        # this is a new target in exhibit: add one to the number of height_no_targets
+        number_of_lines_with_options = number_of_lines_with_options + 1
+
+    exhibit_height_pixels = ((number_of_lines - number_of_lines_with_options)*
+        LINE_HEIGHT_PX)   + (number_of_lines_with_options * ((proposed_option_lines *
+        LINE_HEIGHT_PX) + (2 * (BORDER_PADDING_PX + 3)))) + (2 * (BORDER_PADDING_PX))
+    exhibit_width_pixels = (max_length * CHARACTER_WIDTH_PX) + (2 * BORDER_PADDING_PX)
+
+    # calculate size in pixels needed for an option
+    if proposed_target_text_length > options_max_line_width:
+        proposed_option_max_text_length = proposed_target_text_length
+    else:
+        proposed_option_max_text_length = options_max_line_width
+
+    if proposed_option_lines > options_max_lines:
+        proposed_option_max_lines = proposed_option_lines
+    else:
+        proposed_option_max_lines = options_max_lines
+
+    options_height_pixels = (proposed_option_max_lines * LINE_HEIGHT_PX) + \
+        (2* (BORDER_PADDING_PX))
+    options_width_pixels = (proposed_option_max_text_length * CHARACTER_WIDTH_PX) + \
+        (2* (BORDER_PADDING_PX))
+
+    # allow 5 pixels spacing between sides and options, and between columns
+    if options_width_pixels < ((LIMIT_DND_WIDTH_PX - 20) / 3):
+        # can arrange options side by side in 3 columns
+        options_in_a_row = 3
+    elif options_width_pixels < ((LIMIT_DND_WIDTH_PX - 15) / 2):
+        # can arrange options side by side in 2 columns
+        options_in_a_row = 2
+    else:
+        # need to arrange options in a single column
+        options_in_a_row = 1
+    options_in_a_column = math.ceil(number_of_options / options_in_a_row)
+
+    # allow 5 pixels spacing between rows, and at top and bottom of option area
+    total_options_height_pixels = (options_in_a_column * (options_height_pixels + 5)) + 5
+    total_options_width_pixels = (options_in_a_row * (options_width_pixels + 5)) + 5
+
+    total_height_pixels = total_options_height_pixels + exhibit_height_pixels
+    if total_options_width_pixels > exhibit_width_pixels:
+        total_width_pixels = total_options_width_pixels
+    else:
+        total_width_pixels = exhibit_width_pixels
+
+    return {
+        'exhibit_height_pixels': exhibit_height_pixels,
+        'exhibit_width_pixels': exhibit_width_pixels,
+        'options_height_pixels': options_height_pixels,
+        'options_width_pixels': options_width_pixels,
+        'options_in_a_row': options_in_a_row,
+        'options_in_a_column': options_in_a_column,
+        'total_options_height_pixels': total_options_height_pixels,
+        'total_options_width_pixels': total_options_width_pixels,
+        'total_height_pixels': total_height_pixels,
+        'total_width_pixels': total_width_pixels,
+    }
+
+
+def check_dnd_area_required(area):
+    if area['total_width_pixels'] > LIMIT_DND_WIDTH_PX:
+        raise ValueError("This option will make the exhibit width too large to fit in the item.")
+    elif area['total_height_pixels'] > LIMIT_DND_HEIGHT_PX:
+        raise ValueError("This option will make the combined exhibit and Options height too large to fit in the item.")
+
+
+def check_dnd_exhibit_text(exhibit_text):
+    exhibit_text_into_lines = exhibit_text.split('\n')
+    if len(exhibit_text_into_lines) > LIMIT_EXHIBIT_MAX_LINES:
+        raise ValueError("There are too many lines in the main exhibit.")
+    if find_len_longest_line(exhibit_text) > LIMIT_EXHIBIT_MAX_CHAR:
+        raise ValueError("One or more lines in the main exhibit are too long.")
+
+
+def dnd_item_from_markup(source_text, distractors=()):
+    # headless equivalent of selecting each [[option text]] in the DnD page, then adding each
+    # distractor as manual option text, with the same size checks. Raises ValueError if the
+    # item will not fit
+    matches = list(OPTION_MARKUP_PATTERN.finditer(source_text))
+    if len(matches) + len(distractors) > LIMIT_DND_MAX_OPTIONS:
+        raise ValueError("Too many options: a maximum of " + str(LIMIT_DND_MAX_OPTIONS) + \
+            " options and distractors can be used.")
+
+    options = []
+    options_max_line_width = 0
+    options_max_lines = 0
+    for match_index, match in enumerate(matches):
+        # earlier options have already been replaced by targets; this and later options are
+        # still plain text in the exhibit, as they would be when selected in the DnD page
+        exhibit_text = ''
+        last_end = 0
+        for index, other_match in enumerate(matches):
+            exhibit_text = exhibit_text + source_text[last_end:other_match.start()]
+            if index == match_index:
+                selected_text_start = len(exhibit_text)
+            if index < match_index:
+                exhibit_text = exhibit_text + TARGET_REPLACEMENT
+            else:
+                exhibit_text = exhibit_text + other_match.group(1)
+            last_end = other_match.end()
+        exhibit_text = exhibit_text + source_text[last_end:]
+        check_dnd_exhibit_text(exhibit_text)
+
+        option_text = match.group(1)
+        option_text_into_lines = option_text.split('\n')
+        if len(option_text_into_lines) > LIMIT_DND_OPTION_MAX_LINES:
+            raise ValueError("More than " + str(LIMIT_DND_OPTION_MAX_LINES) + \
+                " lines of text in DnD option: " + option_text)
+        option_line_width = find_len_longest_line(option_text)
+        if option_line_width > LIMIT_DND_OPTION_MAX_CHAR:
+            raise ValueError("More than " + str(LIMIT_DND_OPTION_MAX_CHAR) + \
+                " characters per line in DnD option: " + option_text)
+
+        proposed_option_lines = max(len(option_text_into_lines), options_max_lines)
+        proposed_text_start_line = exhibit_text.count('\n', 0, selected_text_start) + 1
+        check_dnd_area_required(calc_dnd_area_required(exhibit_text, proposed_text_start_line,
+            option_line_width, proposed_option_lines, options_max_line_width, options_max_lines,
+            len(options) + 1))
+
+        options.append(option_text)
+        options_max_lines = proposed_option_lines
+        options_max_line_width = max(option_line_width, options_max_line_width)
+
+    exhibit_text = OPTION_MARKUP_PATTERN.sub(TARGET_REPLACEMENT, source_text)
+    check_dnd_exhibit_text(exhibit_text)
+
+    for distractor_text in distractors:
+        distractor_line_width = find_len_longest_line(distractor_text)
+        proposed_option_lines = max(len(distractor_text.split('\n')), options_max_lines)
+        # not used by manual option text, so set start line to 0 to ignore in size calculations
+        check_dnd_area_required(calc_dnd_area_required(exhibit_text, 0, distractor_line_width,
+            proposed_option_lines, options_max_line_width, options_max_lines,
+            len(options) + 1))
+
+        options.append(distractor_text)
+        options_max_lines = proposed_option_lines
+        options_max_line_width = max(distractor_line_width, options_max_line_width)
+
+    # each check above sized the targets for the option being added, but create_dnd_images
+    # widens every target to the widest option, so check the final layout as well
+    check_dnd_area_required(calc_dnd_area_required(exhibit_text, 0, options_max_line_width,
+        options_max_lines, options_max_line_width, options_max_lines, len(options)))
+
+    return exhibit_text, options, options_max_line_width, options_max_lines
+
+
+def option_image_filename(image_filename, option_number):
+    filename_root, filename_ext = os.path.splitext(image_filename)
+    return filename_root + '_option' + str(option_number) + filename_ext
+
+
+def create_dnd_images(exhibit_text, options, image_filename, options_max_line_width,
+    options_max_lines):
+    area = calc_dnd_area_required(exhibit_text, 0, options_max_line_width, options_max_lines,
+        options_max_line_width, options_max_lines, len(options))
+
+    image_text = re.sub('_____', ('_'*options_max_line_width), exhibit_text)
+    create_variable_spacing_image(image_text, image_filename, area['exhibit_width_pixels'],
+        area['exhibit_height_pixels'], options_max_lines)
+    for option_number, option_text in enumerate(options, start=1):
+        create_image_from_text(option_text, option_image_filename(image_filename, option_number),
+            options_max_line_width, options_max_lines)
+
+
+def read_dnd_distractors(distractors_filename):
+    # distractors are separated by blank lines, so a distractor may span several lines
+    with open(distractors_filename) as distractors_file:
+        distractors_text = distractors_file.read()
+    return [distractor.strip('\n') for distractor in re.split(r'\n\s*\n', distractors_text)
+        if len(distractor.strip()) > 0]
+
+
+def read_item_sources(source_dir):
+    # yield (item_name, source_text, distractors) for every <name>.txt in source_dir,
+    # with distractors read from <name>.distractors.txt if present
+    for source_filename in sorted(os.listdir(source_dir)):
+        if not source_filename.endswith('.txt') or source_filename.endswith('.distractors.txt'):
+            continue
+        item_name = source_filename[:-len('.txt')]
+        with open(os.path.join(source_dir, source_filename)) as source_file:
+            source_text = source_file.read().rstrip('\n')
+        distractors_filename = os.path.join(source_dir, item_name + '.distractors.txt')
+        distractors = []
+        if os.path.exists(distractors_filename):
+            distractors = read_dnd_distractors(distractors_filename)
+        yield item_name, source_text, distractors
+
+
+def create_dnd_images_from_directory(source_dir, output_dir):
+    # returns the number of items which failed the size checks
+    os.makedirs(output_dir, exist_ok=True)
+    failures = 0
+    for item_name, source_text, distractors in read_item_sources(source_dir):
+        try:
+            exhibit_text, options, options_max_line_width, options_max_lines = \
+                dnd_item_from_markup(source_text, distractors)
+        except ValueError as error:
+            print(item_name + ".txt: " + str(error))
+            failures = failures + 1
+            continue
+        create_dnd_images(exhibit_text, options, os.path.join(output_dir, item_name + '.png'),
+            options_max_line_width, options_max_lines)
+
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exhibit Creator")
+    parser.add_argument('--batch', nargs=2, metavar=('SOURCE_DIR', 'OUTPUT_DIR'),
+        help="create DnD images for every [[option]] marked up item in SOURCE_DIR without the GUI")
+    args = parser.parse_args()
+
+    if args.batch:
+        exit(1 if create_dnd_images_from_directory(*args.batch) > 0 else 0)
+
+    APP = ExhibitCreatorapp()
+    APP.mainloop()
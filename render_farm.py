@@ -0,0 +1,288 @@
+#!/usr/bin/python3
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import socket
+import sqlite3
+import argparse
+import tempfile
+import multiprocessing
+
+import exhibit_creator
+
+"""
+//////////////////////////////////////////////////////
+Distributed rendering of basic exhibits and DnD items.
+A coordinator adds render jobs to a queue held in an SQLite database, which may be on a
+shared directory. Any number of workers, on one or more machines, lease a job, render it,
+and mark it done. Jobs name their output images relative to the output directory, which
+each worker is given, so nodes may mount the shared output directory at different paths.
+A job whose worker crashes is leased again once its lease has expired.
+Each job renders into a temporary directory, and the finished images are renamed into
+place, so rendering a job more than once produces the same output files.
+//////////////////////////////////////////////////////
+"""
+LEASE_SECONDS = 60
+POLL_SECONDS = 1
+MAX_ATTEMPTS = 3
+
+
+def connect_queue(queue_filename):
+    # timeout allows workers to wait for each other's short write transactions
+    connection = sqlite3.connect(queue_filename, timeout=30, isolation_level=None)
+    connection.execute("""CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        state TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        lease_owner TEXT,
+        lease_expires REAL,
+        error TEXT)""")
+    return connection
+
+
+def enqueue_job(connection, kind, image_filename, payload):
+    # jobs are keyed by output image filename, relative to the workers' output directory;
+    # a job whose payload has changed, or which has failed, is reset to pending
+    job_id = os.path.normpath(image_filename)
+    if os.path.isabs(job_id) or job_id == os.pardir or job_id.startswith(os.pardir + os.sep):
+        raise ValueError("Image filename must be relative to the output directory: " + \
+            image_filename)
+    payload_json = json.dumps(payload, sort_keys=True)
+    connection.execute("""INSERT INTO jobs (job_id, kind, payload) VALUES (?, ?, ?)
+        ON CONFLICT(job_id) DO UPDATE SET kind=excluded.kind, payload=excluded.payload,
+            state='pending', attempts=0, lease_owner=NULL, lease_expires=NULL, error=NULL
+        WHERE jobs.payload != excluded.payload OR jobs.kind != excluded.kind
+            OR jobs.state = 'failed'""",
+        (job_id, kind, payload_json))
+    return job_id
+
+
+def enqueue_basic_exhibit(connection, exhibit_text, image_filename):
+    max_line_width = exhibit_creator.find_len_longest_line(exhibit_text)
+    no_of_lines = exhibit_creator.find_number_of_lines_in_text(exhibit_text)
+    if max_line_width > exhibit_creator.LIMIT_EXHIBIT_MAX_CHAR:
+        raise ValueError("One or more lines of text are too wide.")
+    elif no_of_lines > exhibit_creator.LIMIT_EXHIBIT_MAX_LINES:
+        raise ValueError("There are too many lines of text.")
+    return enqueue_job(connection, 'basic', image_filename, {
+        'exhibit_text': exhibit_text,
+        'max_line_width': max_line_width,
+        'no_of_lines': no_of_lines,
+    })
+
+
+def enqueue_dnd_item(connection, source_text, distractors, image_filename):
+    exhibit_text, options, options_max_line_width, options_max_lines = \
+        exhibit_creator.dnd_item_from_markup(source_text, distractors)
+    return enqueue_job(connection, 'dnd', image_filename, {
+        'exhibit_text': exhibit_text,
+        'options': options,
+        'options_max_line_width': options_max_line_width,
+        'options_max_lines': options_max_lines,
+    })
+
+
+def enqueue_directory(connection, source_dir):
+    # items with [[option]] markup or distractors are DnD items, anything else is a basic
+    # exhibit; returns the number of items which failed the size checks and were not queued
+    failures = 0
+    for item_name, source_text, distractors in exhibit_creator.read_item_sources(source_dir):
+        image_filename = item_name + '.png'
+        try:
+            if len(distractors) > 0 or exhibit_creator.OPTION_MARKUP_PATTERN.search(source_text):
+                enqueue_dnd_item(connection, source_text, distractors, image_filename)
+            else:
+                enqueue_basic_exhibit(connection, source_text, image_filename)
+        except ValueError as error:
+            print(item_name + ".txt: " + str(error))
+            failures = failures + 1
+
+    return failures
+
+
+def lease_job(connection, worker_id, lease_seconds=LEASE_SECONDS):
+    # returns (job_id, kind, payload) of the next pending or expired job, or None
+    now = time.time()
+    # BEGIN IMMEDIATE takes the write lock, so two workers cannot lease the same job
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.execute("""UPDATE jobs SET state='failed', error='lease expired'
+            WHERE state='leased' AND lease_expires < ? AND attempts >= ?""",
+            (now, MAX_ATTEMPTS))
+        job = connection.execute("""SELECT job_id, kind, payload FROM jobs
+            WHERE state='pending' OR (state='leased' AND lease_expires < ?)
+            ORDER BY rowid LIMIT 1""", (now,)).fetchone()
+        if job is not None:
+            connection.execute("""UPDATE jobs SET state='leased', attempts=attempts+1,
+                lease_owner=?, lease_expires=? WHERE job_id=?""",
+                (worker_id, now + lease_seconds, job[0]))
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+
+    if job is None:
+        return None
+    return job[0], job[1], json.loads(job[2])
+
+
+def complete_job(connection, job_id, worker_id, kind, payload, render_dir, image_filename):
+    # the rendered images are only renamed into place while this worker still holds the lease
+    # on an unchanged job, so a worker which has lost its lease, or rendered a payload which
+    # has since been re-queued, cannot overwrite a newer render. Returns True if completed.
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        # payloads are stored as json.dumps(payload, sort_keys=True), so compare the same form
+        still_leased = connection.execute("""SELECT 1 FROM jobs WHERE job_id=? AND lease_owner=?
+            AND state='leased' AND kind=? AND payload=?""",
+            (job_id, worker_id, kind, json.dumps(payload, sort_keys=True))).fetchone()
+        if still_leased is not None:
+            place_rendered_images(render_dir, image_filename)
+            connection.execute("""UPDATE jobs SET state='done', lease_expires=NULL, error=NULL
+                WHERE job_id=?""", (job_id,))
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    return still_leased is not None
+
+
+def fail_job(connection, job_id, worker_id, error):
+    connection.execute("""UPDATE jobs SET
+        state=CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+        lease_expires=NULL, error=?
+        WHERE job_id=? AND lease_owner=? AND state='leased'""",
+        (MAX_ATTEMPTS, error, job_id, worker_id))
+
+
+def count_jobs(connection):
+    return dict(connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+
+def render_job(kind, payload, render_filename):
+    if kind == 'basic':
+        exhibit_creator.create_image_from_text(payload['exhibit_text'], render_filename,
+            payload['max_line_width'], payload['no_of_lines'])
+    elif kind == 'dnd':
+        exhibit_creator.create_dnd_images(payload['exhibit_text'], payload['options'],
+            render_filename, payload['options_max_line_width'], payload['options_max_lines'])
+    else:
+        raise ValueError("Unknown job kind: " + kind)
+
+
+def place_rendered_images(render_dir, image_filename):
+    output_dir = os.path.dirname(image_filename)
+    rendered_filenames = os.listdir(render_dir)
+    for rendered_filename in rendered_filenames:
+        os.replace(os.path.join(render_dir, rendered_filename),
+            os.path.join(output_dir, rendered_filename))
+
+    # remove option images left by an earlier render of this item with more options
+    filename_root, filename_ext = os.path.splitext(os.path.basename(image_filename))
+    option_pattern = re.compile(re.escape(filename_root) + r'_option\d+' + \
+        re.escape(filename_ext))
+    for output_filename in os.listdir(output_dir):
+        if option_pattern.fullmatch(output_filename) and \
+            output_filename not in rendered_filenames:
+            os.remove(os.path.join(output_dir, output_filename))
+
+
+def process_job(connection, output_dir, worker_id, job):
+    # render into a temporary directory next to the output, then rename each image into
+    # place, so a partly rendered job never leaves partial images in the output directory.
+    # Returns True if the job was rendered and completed by this worker.
+    job_id, kind, payload = job
+    image_filename = os.path.join(output_dir, job_id)
+    os.makedirs(os.path.dirname(image_filename), exist_ok=True)
+    render_dir = tempfile.mkdtemp(prefix='.render-', dir=os.path.dirname(image_filename))
+    try:
+        render_job(kind, payload, os.path.join(render_dir, os.path.basename(image_filename)))
+        return complete_job(connection, job_id, worker_id, kind, payload, render_dir,
+            image_filename)
+    except Exception as error:
+        print(worker_id + ": " + job_id + ": " + str(error))
+        fail_job(connection, job_id, worker_id, str(error))
+        return False
+    finally:
+        shutil.rmtree(render_dir, ignore_errors=True)
+
+
+def run_worker(queue_filename, output_dir, worker_id=None, lease_seconds=LEASE_SECONDS,
+    exit_when_idle=True):
+    # renders until the queue is empty, or forever if exit_when_idle is False;
+    # returns the number of jobs rendered by this worker
+    if worker_id is None:
+        worker_id = socket.gethostname() + ':' + str(os.getpid())
+    connection = connect_queue(queue_filename)
+    jobs_rendered = 0
+    while True:
+        job = lease_job(connection, worker_id, lease_seconds)
+        if job is None:
+            job_counts = count_jobs(connection)
+            if exit_when_idle and job_counts.get('pending', 0) == 0 and \
+                job_counts.get('leased', 0) == 0:
+                break
+            # other workers' leases may yet expire, so wait before trying again
+            time.sleep(POLL_SECONDS)
+            continue
+
+        if process_job(connection, output_dir, worker_id, job):
+            jobs_rendered = jobs_rendered + 1
+
+    connection.close()
+    return jobs_rendered
+
+
+def run_local_workers(queue_filename, output_dir, number_of_workers,
+    lease_seconds=LEASE_SECONDS, exit_when_idle=True):
+    workers = [multiprocessing.Process(target=run_worker,
+        args=(queue_filename, output_dir, None, lease_seconds, exit_when_idle))
+        for worker_number in range(number_of_workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    # number of worker processes which crashed
+    return len([worker for worker in workers if worker.exitcode != 0])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exhibit Creator render farm")
+    parser.add_argument('queue', help="SQLite queue file, on a shared directory for multiple nodes")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    enqueue_parser = subparsers.add_parser('enqueue', help="queue every item in SOURCE_DIR")
+    enqueue_parser.add_argument('source_dir')
+    worker_parser = subparsers.add_parser('worker',
+        help="render jobs from the queue into OUTPUT_DIR")
+    worker_parser.add_argument('output_dir')
+    worker_parser.add_argument('--processes', type=int, default=1)
+    worker_parser.add_argument('--lease-seconds', type=int, default=LEASE_SECONDS)
+    worker_parser.add_argument('--keep-running', action='store_true',
+        help="wait for new jobs instead of exiting when the queue is empty")
+    subparsers.add_parser('status', help="show the number of jobs in each state")
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        connection = connect_queue(args.queue)
+        failures = enqueue_directory(connection, args.source_dir)
+        print(count_jobs(connection))
+        sys.exit(1 if failures > 0 else 0)
+    elif args.command == 'worker':
+        crashed_workers = 0
+        if args.processes > 1:
+            crashed_workers = run_local_workers(args.queue, args.output_dir, args.processes,
+                args.lease_seconds, not args.keep_running)
+        else:
+            run_worker(args.queue, args.output_dir, lease_seconds=args.lease_seconds,
+                exit_when_idle=not args.keep_running)
+        job_counts = count_jobs(connect_queue(args.queue))
+        print(job_counts)
+        sys.exit(1 if crashed_workers > 0 or job_counts.get('failed', 0) > 0 else 0)
+    else:
+        print(count_jobs(connect_queue(args.queue)))
@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+import exhibit_creator
+
+
+def test_dnd_item_from_markup_substitutes_targets():
+    exhibit_text, options, options_max_line_width, options_max_lines = \
+        exhibit_creator.dnd_item_from_markup(
+            "The [[quick]] brown fox\njumps over [[the lazy]] dog", ['cat'])
+
+    assert exhibit_text == "The  _____  brown fox\njumps over  _____  dog"
+    assert options == ['quick', 'the lazy', 'cat']
+    assert options_max_line_width == 8
+    assert options_max_lines == 1
+
+
+def test_dnd_item_from_markup_multi_line_option():
+    exhibit_text, options, options_max_line_width, options_max_lines = \
+        exhibit_creator.dnd_item_from_markup("start [[one\ntwo]] end")
+
+    assert exhibit_text == "start  _____  end"
+    assert options == ['one\ntwo']
+    assert options_max_lines == 2
+
+
+def test_read_dnd_distractors(tmp_path):
+    distractors_filename = tmp_path / 'item.distractors.txt'
+    distractors_filename.write_text("cat\nhat\n\n\nmoose\n  \nelk\n")
+
+    assert exhibit_creator.read_dnd_distractors(str(distractors_filename)) == \
+        ['cat\nhat', 'moose', 'elk']
+
+
+def test_read_item_sources(tmp_path):
+    (tmp_path / 'b.txt').write_text("plain exhibit\n")
+    (tmp_path / 'a.txt').write_text("with [[option]]\n")
+    (tmp_path / 'a.distractors.txt').write_text("distractor\n")
+    (tmp_path / 'notes.md').write_text("ignored")
+
+    assert list(exhibit_creator.read_item_sources(str(tmp_path))) == [
+        ('a', "with [[option]]", ['distractor']),
+        ('b', "plain exhibit", []),
+    ]
+
+
+def test_dnd_item_from_markup_option_limits():
+    too_many_options = ' '.join('[[' + str(number) + ']]' for number in range(10))
+    with pytest.raises(ValueError):
+        exhibit_creator.dnd_item_from_markup(too_many_options, ['extra'])
+    exhibit_creator.dnd_item_from_markup(too_many_options)
+
+    with pytest.raises(ValueError):
+        exhibit_creator.dnd_item_from_markup("x [[1\n2\n3\n4]]")
+    exhibit_creator.dnd_item_from_markup("x [[1\n2\n3]]")
+
+    with pytest.raises(ValueError):
+        exhibit_creator.dnd_item_from_markup(
+            "x [[" + 'a' * (exhibit_creator.LIMIT_DND_OPTION_MAX_CHAR + 1) + "]]")
+    exhibit_creator.dnd_item_from_markup(
+        "x [[" + 'a' * exhibit_creator.LIMIT_DND_OPTION_MAX_CHAR + "]]")
+
+
+def test_dnd_item_from_markup_exhibit_limits():
+    with pytest.raises(ValueError):
+        exhibit_creator.dnd_item_from_markup('x' * (exhibit_creator.LIMIT_EXHIBIT_MAX_CHAR + 1))
+    with pytest.raises(ValueError):
+        exhibit_creator.dnd_item_from_markup(
+            '\n' * exhibit_creator.LIMIT_EXHIBIT_MAX_LINES)
+
+
+def test_dnd_item_from_markup_checks_final_width():
+    # every check while adding options passes, but the final layout widens both
+    # targets to the longest option
+    with pytest.raises(ValueError):
+        exhibit_creator.dnd_item_from_markup('X' * 30 + " [[" + 'a' * 45 + "]] and [[b]]")
+
+
+def test_final_area_fits_and_matches_rendered_images(tmp_path):
+    exhibit_text, options, options_max_line_width, options_max_lines = \
+        exhibit_creator.dnd_item_from_markup(
+            "The [[quick]] brown fox\njumps over [[the\nlazy]] dog", ['cat'])
+    area = exhibit_creator.calc_dnd_area_required(exhibit_text, 0, options_max_line_width,
+        options_max_lines, options_max_line_width, options_max_lines, len(options))
+
+    assert area['total_width_pixels'] <= exhibit_creator.LIMIT_DND_WIDTH_PX
+    assert area['total_height_pixels'] <= exhibit_creator.LIMIT_DND_HEIGHT_PX
+    # 2 target lines, each 2 option lines high plus spacing, and 6 pixels padding
+    assert area['exhibit_height_pixels'] == 2 * ((2 * 17) + (2 * 9)) + (2 * 6)
+    assert area['options_width_pixels'] == (5 * 9) + (2 * 6)
+    assert area['options_in_a_row'] == 3
+    assert area['options_in_a_column'] == 1
+
+    image_filename = str(tmp_path / 'item.png')
+    exhibit_creator.create_dnd_images(exhibit_text, options, image_filename,
+        options_max_line_width, options_max_lines)
+    assert Image.open(image_filename).size == \
+        (area['exhibit_width_pixels'], area['exhibit_height_pixels'])
+    for option_number in (1, 2, 3):
+        option_image = Image.open(exhibit_creator.option_image_filename(image_filename,
+            option_number))
+        assert option_image.size == (area['options_width_pixels'], area['options_height_pixels'])
+
+
+def test_create_dnd_images_from_directory(tmp_path):
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    (source_dir / 'good.txt').write_text("The [[quick]] brown fox\n")
+    (source_dir / 'good.distractors.txt').write_text("cat\n")
+    (source_dir / 'bad.txt').write_text("x [[1\n2\n3\n4]]\n")
+    output_dir = tmp_path / 'output'
+
+    assert exhibit_creator.create_dnd_images_from_directory(str(source_dir),
+        str(output_dir)) == 1
+    assert sorted(os.listdir(output_dir)) == ['good.png', 'good_option1.png', 'good_option2.png']
+
+
+def test_pdf_text_uses_win_ansi_encoding(capsys):
+    pdf = exhibit_creator.vector_pdf_from_lines([(6, "“hello” — €5 ☃")], 200, 30, 12)
+
+    assert "(“hello” — €5 ?)".encode('cp1252') in pdf
+    assert "☃" in capsys.readouterr().out
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+import render_farm
+
+
+def test_local_workers_finish_every_job(tmp_path):
+    queue_filename = str(tmp_path / 'queue.db')
+    output_dir = str(tmp_path / 'output')
+    connection = render_farm.connect_queue(queue_filename)
+
+    for item_number in range(10):
+        render_farm.enqueue_basic_exhibit(connection, "Exhibit " + str(item_number) + "\nline 2",
+            'basic' + str(item_number) + '.png')
+        render_farm.enqueue_dnd_item(connection,
+            "Item " + str(item_number) + " [[alpha]] text\nmore [[beta]] here", ['gamma'],
+            'dnd' + str(item_number) + '.png')
+    # a job which fails on every attempt
+    render_farm.enqueue_job(connection, 'unknown', 'broken.png', {})
+
+    # a worker leases a job and crashes, so its lease expires without the job completing
+    crashed_job_id = render_farm.lease_job(connection, 'crashed-worker', lease_seconds=0.5)[0]
+    time.sleep(0.6)
+
+    assert render_farm.run_local_workers(queue_filename, output_dir, 3, lease_seconds=30) == 0
+
+    jobs = dict((job_id, (state, attempts)) for job_id, state, attempts in
+        connection.execute("SELECT job_id, state, attempts FROM jobs").fetchall())
+    assert len(jobs) == 21
+    for state, attempts in jobs.values():
+        assert state in ('done', 'failed')
+        assert attempts <= render_farm.MAX_ATTEMPTS
+    assert jobs['broken.png'] == ('failed', render_farm.MAX_ATTEMPTS)
+    assert jobs[crashed_job_id] == ('done', 2)
+    assert render_farm.count_jobs(connection) == {'done': 20, 'failed': 1}
+
+    for item_number in range(10):
+        assert os.path.exists(os.path.join(output_dir, 'basic' + str(item_number) + '.png'))
+        for option_number in (1, 2, 3):
+            assert os.path.exists(os.path.join(output_dir,
+                'dnd' + str(item_number) + '_option' + str(option_number) + '.png'))
+    assert not any(filename.startswith('.render-') for filename in os.listdir(output_dir))
+
+
+def test_worker_which_lost_its_lease_does_not_replace_newer_images(tmp_path):
+    output_dir = str(tmp_path / 'output')
+    connection = render_farm.connect_queue(str(tmp_path / 'queue.db'))
+
+    render_farm.enqueue_dnd_item(connection, "old [[a]] [[b]] [[c]]", [], 'item.png')
+    old_job = render_farm.lease_job(connection, 'worker-a')
+    # the item is re-queued while worker A is rendering it, and worker B renders the new item
+    render_farm.enqueue_dnd_item(connection, "new [[xyz]]", [], 'item.png')
+    new_job = render_farm.lease_job(connection, 'worker-b')
+    assert render_farm.process_job(connection, output_dir, 'worker-b', new_job)
+
+    assert not render_farm.process_job(connection, output_dir, 'worker-a', old_job)
+
+    assert render_farm.count_jobs(connection) == {'done': 1}
+    assert sorted(os.listdir(output_dir)) == ['item.png', 'item_option1.png']
+    new_payload = new_job[2]
+    area = render_farm.exhibit_creator.calc_dnd_area_required(new_payload['exhibit_text'], 0,
+        new_payload['options_max_line_width'], new_payload['options_max_lines'],
+        new_payload['options_max_line_width'], new_payload['options_max_lines'], 1)
+    with Image.open(os.path.join(output_dir, 'item.png')) as image:
+        assert image.size == (area['exhibit_width_pixels'], area['exhibit_height_pixels'])
+
+
+def test_enqueue_job_requires_filename_inside_output_directory(tmp_path):
+    connection = render_farm.connect_queue(str(tmp_path / 'queue.db'))
+
+    assert render_farm.enqueue_job(connection, 'basic', '..hidden.png', {}) == '..hidden.png'
+    for image_filename in ('..', os.path.join('..', 'item.png'), os.path.abspath('item.png')):
+        with pytest.raises(ValueError):
+            render_farm.enqueue_job(connection, 'basic', image_filename, {})
+
+
+def test_worker_command_exits_with_error_when_a_job_fails(tmp_path):
+    queue_filename = str(tmp_path / 'queue.db')
+    output_dir = str(tmp_path / 'output')
+    connection = render_farm.connect_queue(queue_filename)
+    render_farm.enqueue_basic_exhibit(connection, "Exhibit", 'good.png')
+    worker_command = [sys.executable, render_farm.__file__, queue_filename, 'worker', output_dir]
+
+    assert subprocess.run(worker_command).returncode == 0
+
+    render_farm.enqueue_job(connection, 'unknown', 'broken.png', {})
+    assert subprocess.run(worker_command).returncode == 1